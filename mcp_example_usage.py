@@ -5,14 +5,21 @@ This script demonstrates how to use the MCP system to enable communication
 between different language models (Claude, Gemini 2.5 Pro, and ChatGPT).
 """
 
-from mcp_implementation import ModelControlProtocol
+import logging
+
+from mcp_implementation import ModelControlProtocol, configure_logging, flush_logging
 
 def simulate_model_interaction():
     """Simulate a complete interaction between models"""
+    # Show every message as it is sent and received. The log is written from
+    # a background thread, so flush it before each block of printed output.
+    configure_logging(logging.DEBUG)
+    
     # Initialize the MCP
     mcp = ModelControlProtocol("example_session.db")
     
     # Start with a user query
+    flush_logging()
     initial_query = "Compare the approaches to solving climate change"
     print(f"\n[User] Initial query: {initial_query}")
     print("\n=== Starting Model Conversation ===")
@@ -22,16 +29,19 @@ def simulate_model_interaction():
     responses = mcp.execute_turn(initial_query)
     
     # Second turn - models continue the conversation
+    flush_logging()
     print("\n--- Turn 2 ---")
     responses = mcp.execute_turn()
     
     # Third turn - final responses
+    flush_logging()
     print("\n--- Turn 3 ---")
     responses = mcp.execute_turn()
     
     # Show the message history
     messages = mcp.get_all_messages()
     
+    flush_logging()
     print("\n=== Complete Message History ===")
     for msg in messages:
         msg_id, sender, receiver, content, timestamp = msg
@@ -1,53 +1,594 @@
 import sqlite3
 import datetime
-import time
 import os
+import sys
+import time
+import atexit
+import weakref
+import asyncio
+import functools
+import hashlib
+import logging
+import queue
+import zlib
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    # Optional: BLAKE3 hashes long prompts several times faster than SHA-256
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+logger = logging.getLogger(__name__)
+
+# QueueListener started by configure_logging, reused by later calls
+_log_listener = None
+
+# SQL for the per-call queries. Keeping the text identical across calls lets
+# sqlite3's statement cache on the long-lived connection reuse the compiled
+# statements instead of re-parsing them every time.
+INSERT_MSG_SQL = '''
+INSERT INTO messages (model_id, message_type, message_content, ts)
+VALUES (?, ?, ?, ?)
+'''
+
+INSERT_MSG_WITH_ID_SQL = '''
+INSERT INTO messages (id, model_id, message_type, message_content, ts)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+SELECT_NEXT_ID_SQL = 'SELECT COALESCE(MAX(id), 0) + 1 FROM messages'
+
+INSERT_INTERACTION_SQL = '''
+INSERT INTO model_interactions (model1_id, model2_id, message_id, message_content, ts)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+SELECT_MESSAGE_SQL = '''
+SELECT message_content, model1_id
+FROM model_interactions
+WHERE message_id = ? AND model2_id = ?
+'''
+
+SELECT_LATEST_SQL = '''
+SELECT message_content, model1_id
+FROM model_interactions
+WHERE model2_id = ?
+ORDER BY message_id DESC
+LIMIT 1
+'''
+
+SELECT_HISTORY_SQL = '''
+SELECT message_id, model1_id, model2_id, message_content, ts
+FROM model_interactions
+WHERE message_id > ?
+ORDER BY message_id ASC
+LIMIT ?
+'''
+
+SELECT_CACHE_SQL = 'SELECT response FROM response_cache WHERE key = ?'
+
+INSERT_CACHE_SQL = '''
+INSERT OR REPLACE INTO response_cache (key, response, ts)
+VALUES (?, ?, ?)
+'''
+
+# Number of (model_id, message_id) lookups kept in the in-memory LRU cache
+MESSAGE_CACHE_SIZE = 1024
+
+# Message content longer than this many characters is stored compressed
+COMPRESSION_THRESHOLD = 256
+
+# Leading byte marking how a BLOB of message content is encoded
+ZLIB_FLAG = b'\x01'
+
+
+# SQL expression for the current time in Unix epoch milliseconds
+NOW_MS_SQL = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+
+def now_ms():
+    """Return the current time in Unix epoch milliseconds."""
+    return time.time_ns() // 1_000_000
+
+
+def format_ts(ts):
+    """Format an epoch-milliseconds timestamp as a UTC 'YYYY-MM-DD HH:MM:SS' string."""
+    return datetime.datetime.fromtimestamp(ts / 1000, datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def encode_content(content):
+    """
+    Prepare message content for storage, compressing it if it is long.
+    
+    Args:
+        content: The message content
+        
+    Returns:
+        value: The content as TEXT, or a flagged, compressed BLOB
+    """
+    if len(content) <= COMPRESSION_THRESHOLD:
+        return content
+    
+    return ZLIB_FLAG + zlib.compress(content.encode('utf-8'), 6)
+
+
+def decode_content(value):
+    """
+    Restore message content written by encode_content.
+    
+    Args:
+        value: The stored TEXT or BLOB value
+        
+    Returns:
+        content: The original message content
+    """
+    if isinstance(value, bytes):
+        if value[:1] != ZLIB_FLAG:
+            raise ValueError(f"Unknown message content encoding: {value[:1]!r}")
+        return zlib.decompress(value[1:]).decode('utf-8')
+    
+    return value
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Send the MCP log to stdout from a background thread.
+    
+    Records are handed to a queue and written by a QueueListener, so stdout
+    I/O stays off the path of execute_turn. Scripts that print their own
+    output between log records should call flush_logging() before printing.
+    Only the first call starts the listener; later calls just update the
+    level, so records are never written twice.
+    
+    Args:
+        level: The minimum level to log; DEBUG shows every message sent and received
+        
+    Returns:
+        listener: The started QueueListener (stopped automatically at exit)
+    """
+    global _log_listener
+    
+    logger.setLevel(level)
+    if _log_listener is not None:
+        return _log_listener
+    
+    log_queue = queue.SimpleQueue()
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+    
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    
+    listener.start()
+    atexit.register(listener.stop)
+    _log_listener = listener
+    return listener
+
+
+def flush_logging():
+    """Wait until the background listener has written every queued log record."""
+    if _log_listener is not None:
+        # stop() drains the queue and joins the thread; start a fresh one after
+        _log_listener.stop()
+        _log_listener.start()
+
+
+def cache_key(model_id, received):
+    """
+    Build the response cache key for a model call.
+    
+    Args:
+        model_id: The model being called
+        received: The message the model received, or None
+        
+    Returns:
+        key: Hex digest identifying the call
+    """
+    data = f"{model_id}|{received or ''}".encode()
+    
+    if blake3 is not None:
+        return blake3(data).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+class SemanticCache:
+    """
+    Approximate response cache that matches prompts by embedding similarity.
+    
+    Prompts are embedded with a sentence-transformers model and searched in a
+    per-model FAISS inner-product index, so paraphrases of an earlier prompt
+    can reuse its response. Requires the optional sentence-transformers and
+    faiss packages; entries are kept in memory only.
+    """
+    
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2", threshold=0.85,
+                 device=None, batch_size=32, batch_timeout=0.005):
+        """
+        Load the embedding model.
+        
+        Args:
+            model_name: The sentence-transformers model used to embed prompts
+            threshold: Minimum cosine similarity for a cached response to be reused
+            device: Device for the embedding model, e.g. "cuda" (default: picked
+                by sentence-transformers). On CUDA the FAISS indexes are moved
+                to the GPU too when faiss has GPU support.
+            batch_size: Maximum number of prompts embedded together by encode_async
+            batch_timeout: Seconds encode_async waits to fill a batch, only when
+                other prompts are already queued alongside the first one
+        """
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("SemanticCache requires the sentence-transformers and faiss packages") from e
+        
+        self._faiss = faiss
+        self.encoder = SentenceTransformer(model_name, device=device)
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        # model_id -> (FAISS index, responses in index order)
+        self._indexes = {}
+        
+        self._gpu_resources = None
+        self._gpu_index = 0
+        if self.encoder.device.type == 'cuda' and hasattr(faiss, 'StandardGpuResources'):
+            self._gpu_resources = faiss.StandardGpuResources()
+            # Keep the indexes on the same GPU as the encoder ("cuda" means GPU 0)
+            self._gpu_index = self.encoder.device.index or 0
+        
+        # Batching state for encode_async, bound to the event loop it runs in
+        self._batch_loop = None
+        self._batch_queue = None
+        self._batch_task = None
+    
+    def _encode_batch(self, prompts):
+        """Embed prompts as a normalized (len(prompts), dim) float32 array."""
+        return self.encoder.encode(
+            prompts, batch_size=len(prompts), convert_to_numpy=True, normalize_embeddings=True
+        ).astype('float32')
+    
+    def encode(self, prompt):
+        """Embed a prompt as a normalized (1, dim) float32 array."""
+        return self._encode_batch([prompt])
+    
+    async def encode_async(self, prompt):
+        """
+        Embed a prompt, batching it with prompts submitted concurrently.
+        
+        Args:
+            prompt: The prompt to embed
+            
+        Returns:
+            embedding: A normalized (1, dim) float32 array
+        """
+        loop = asyncio.get_running_loop()
+        if self._batch_loop is not loop:
+            # asyncio.run() creates a new loop per turn, so the queue and
+            # worker are recreated for each loop they are used in
+            self._batch_loop = loop
+            self._batch_queue = asyncio.Queue()
+            self._batch_task = loop.create_task(self._batch_worker(self._batch_queue))
+        elif self._batch_task.done():
+            # The worker was cancelled or failed; restart it on the same
+            # queue so prompts already waiting there are still embedded
+            self._batch_task = loop.create_task(self._batch_worker(self._batch_queue))
+        
+        future = loop.create_future()
+        await self._batch_queue.put((prompt, future))
+        return await future
+    
+    async def _batch_worker(self, batch_queue):
+        """Collect queued prompts into batches and embed them off the event loop."""
+        loop = asyncio.get_running_loop()
+        batch = []
+        
+        try:
+            while True:
+                batch = [await batch_queue.get()]
+                self._drain(batch_queue, batch)
+                
+                # Only wait for more prompts when others arrived alongside the
+                # first; a lone prompt is embedded straight away
+                if len(batch) > 1:
+                    deadline = loop.time() + self.batch_timeout
+                    while len(batch) < self.batch_size:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(batch_queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+                        self._drain(batch_queue, batch)
+                
+                prompts = [prompt for prompt, future in batch]
+                try:
+                    embeddings = await loop.run_in_executor(None, self._encode_batch, prompts)
+                except Exception as e:
+                    for prompt, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for (prompt, future), embedding in zip(batch, embeddings):
+                    if not future.done():
+                        future.set_result(embedding[None])
+        finally:
+            # If the worker stops, don't leave the prompts it had taken
+            # waiting forever; encode_async starts a new worker for the rest
+            for prompt, future in batch:
+                if not future.done():
+                    future.cancel()
+    
+    def _drain(self, batch_queue, batch):
+        """Move already-queued prompts into the batch, up to batch_size."""
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(batch_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+    
+    def lookup(self, model_id, embedding):
+        """
+        Find the cached response whose prompt is most similar to the embedding.
+        
+        Args:
+            model_id: The model being called
+            embedding: The prompt embedding from encode()
+            
+        Returns:
+            response: The cached response or None if nothing is similar enough
+        """
+        entry = self._indexes.get(model_id)
+        if entry is None:
+            return None
+        
+        index, responses = entry
+        scores, ids = index.search(embedding, 1)
+        if scores[0, 0] >= self.threshold:
+            return responses[ids[0, 0]]
+        return None
+    
+    def add(self, model_id, embedding, response):
+        """
+        Cache a response under its prompt embedding.
+        
+        Args:
+            model_id: The model that produced the response
+            embedding: The prompt embedding from encode()
+            response: The model's response
+        """
+        if model_id not in self._indexes:
+            index = self._faiss.IndexFlatIP(embedding.shape[1])
+            if self._gpu_resources is not None:
+                index = self._faiss.index_cpu_to_gpu(self._gpu_resources, self._gpu_index, index)
+            self._indexes[model_id] = (index, [])
+        
+        index, responses = self._indexes[model_id]
+        index.add(embedding)
+        responses.append(response)
+
+
+def cached_call(func):
+    """
+    Cache the responses of a model call in the response_cache table.
+    
+    The wrapped coroutine must take (self, model_id, received); identical
+    prompts sent to the same model are answered from the cache instead. When
+    the instance has a semantic_cache, exact misses are then looked up by
+    prompt similarity before the model is called. Only responses the model
+    actually produced are stored in response_cache; semantic hits are
+    approximate and stay in the in-memory semantic cache.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, model_id, received):
+        key = cache_key(model_id, received)
+        
+        response = self.get_cached_response(key)
+        if response is None:
+            embedding = None
+            if self.semantic_cache is not None and received:
+                embedding = await self.semantic_cache.encode_async(received)
+                response = self.semantic_cache.lookup(model_id, embedding)
+            
+            if response is None:
+                response = await func(self, model_id, received)
+                self.store_cached_response(key, response)
+                if embedding is not None:
+                    self.semantic_cache.add(model_id, embedding, response)
+        
+        return response
+    
+    return wrapper
 
 class ModelControlProtocol:
-    def __init__(self, db_path="mcp_database.db"):
+    def __init__(self, db_path="mcp_database.db", semantic_cache=None):
         """
         Initialize the Model Control Protocol with a SQLite database.
         
         Args:
             db_path: Path to the SQLite database file
+            semantic_cache: Optional SemanticCache consulted when the exact
+                response cache misses
         """
         self.db_path = db_path
+        self.semantic_cache = semantic_cache
         self.models = ['Claude', 'Gemini', 'ChatGPT']
         self.current_model_index = 0
+        # Each model paired with the next one in the cycle, computed once
+        self.model_pairs = list(zip(self.models, self.models[1:] + self.models[:1]))
+        self._conn = None
+        self._close_conn = None
+        self._in_turn = False
+        self._pending_messages = []
+        self._turn_lock = None
+        self._turn_lock_loop = None
+        self.connect()
         self.setup_database()
     
+    def connect(self):
+        """Open the long-lived SQLite connection shared by all database operations."""
+        if self._conn is not None:
+            return
+        
+        self._conn = sqlite3.connect(self.db_path)
+        # Closes the connection when the instance is garbage collected or at
+        # interpreter exit, without keeping the instance alive until then
+        self._close_conn = weakref.finalize(self, self._conn.close)
+        self._message_cache = OrderedDict()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+    
+    def close(self):
+        """Close the SQLite connection if it is open."""
+        if self._conn is not None:
+            self._close_conn()
+            self._conn = None
+    
+    def begin_turn(self):
+        """Start buffering sent messages so the whole turn is written in one transaction."""
+        if self._in_turn:
+            raise RuntimeError("A turn is already in progress on this ModelControlProtocol")
+        
+        self._in_turn = True
+        self._pending_messages = []
+    
+    def end_turn(self):
+        """
+        Write the messages buffered during the current turn and commit them.
+        
+        Returns:
+            message_ids: The IDs assigned to the turn's messages, in send order
+        """
+        try:
+            return self.flush_messages()
+        finally:
+            self._in_turn = False
+    
+    def abort_turn(self):
+        """Discard the messages buffered during the current turn without writing them."""
+        self._pending_messages = []
+        self._conn.rollback()
+        self._in_turn = False
+    
+    def flush_messages(self):
+        """
+        Insert the buffered messages and their interactions in one transaction.
+        
+        No transaction is held while the turn's models run; the write lock is
+        only taken here, for the two executemany calls.
+        
+        Returns:
+            message_ids: The IDs assigned to the flushed messages, in send order
+        """
+        if not self._pending_messages:
+            return []
+        
+        pending, self._pending_messages = self._pending_messages, []
+        
+        # IMMEDIATE takes the write lock before reading MAX(id), so the IDs
+        # allocated here cannot be claimed by another writer
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            first_id = self._conn.execute(SELECT_NEXT_ID_SQL).fetchone()[0]
+            message_ids = list(range(first_id, first_id + len(pending)))
+            rows = [(message_id, *row) for message_id, row in zip(message_ids, pending)]
+            
+            self._conn.executemany(INSERT_MSG_WITH_ID_SQL, [
+                (message_id, sender_model, message_type, content, ts)
+                for message_id, sender_model, receiver_model, message_type, content, ts in rows
+            ])
+            self._conn.executemany(INSERT_INTERACTION_SQL, [
+                (sender_model, receiver_model, message_id, content, ts)
+                for message_id, sender_model, receiver_model, message_type, content, ts in rows
+            ])
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+        
+        return message_ids
+    
     def setup_database(self):
         """Create the necessary tables in the SQLite database if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         # Create messages table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             model_id TEXT NOT NULL,
             message_type TEXT NOT NULL,
             message_content TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            ts INTEGER NOT NULL DEFAULT (''' + NOW_MS_SQL + ''')
         )
         ''')
         
         # Create model_interactions table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS model_interactions (
-            interaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            interaction_id INTEGER PRIMARY KEY,
             model1_id TEXT NOT NULL,
             model2_id TEXT NOT NULL,
             message_id INTEGER NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            message_content TEXT NOT NULL,
+            ts INTEGER NOT NULL DEFAULT (''' + NOW_MS_SQL + '''),
             FOREIGN KEY (message_id) REFERENCES messages (id)
         )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Databases created before message_content was copied onto
+        # model_interactions need the column added and backfilled
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(model_interactions)')]
+        if 'message_content' not in columns:
+            cursor.execute('ALTER TABLE model_interactions ADD COLUMN message_content TEXT')
+            cursor.execute('''
+            UPDATE model_interactions
+            SET message_content = (SELECT m.message_content FROM messages m WHERE m.id = message_id)
+            ''')
+        
+        # Index the lookups used by receive_message and get_all_messages
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_mi_receiver_msg
+        ON model_interactions (model2_id, message_id DESC)
+        ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_mi_message
+        ON model_interactions (message_id)
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_msg_ts')
+        
+        # Create response_cache table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS response_cache (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            ts INTEGER NOT NULL DEFAULT (''' + NOW_MS_SQL + ''')
+        )
+        ''')
+        
+        # Databases created before timestamps were stored as epoch milliseconds
+        # get a ts column converted from the old ISO timestamp column. SQLite
+        # cannot add a column with a non-constant default, so inserts always
+        # supply ts explicitly.
+        for table in ('messages', 'model_interactions', 'response_cache'):
+            columns = [row[1] for row in cursor.execute(f'PRAGMA table_info({table})')]
+            if 'ts' not in columns:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN ts INTEGER')
+                cursor.execute(f'''
+                UPDATE {table}
+                SET ts = CAST((julianday(timestamp) - 2440587.5) * 86400000 AS INTEGER)
+                ''')
         
-        print(f"Database initialized at {self.db_path}")
+        self._conn.commit()
+        
+        logger.info("Database initialized at %s", self.db_path)
     
     def send_message(self, sender_model, receiver_model, message_content, message_type="text"):
         """
@@ -60,29 +601,29 @@ class ModelControlProtocol:
             message_type: The type of message (default: "text")
             
         Returns:
-            message_id: The ID of the stored message
+            message_id: The ID of the stored message, or None inside a turn,
+                where IDs are assigned when the turn is written (see end_turn)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Store the message
-        cursor.execute('''
-        INSERT INTO messages (model_id, message_type, message_content)
-        VALUES (?, ?, ?)
-        ''', (sender_model, message_type, message_content))
-        
-        message_id = cursor.lastrowid
-        
-        # Store the interaction
-        cursor.execute('''
-        INSERT INTO model_interactions (model1_id, model2_id, message_id)
-        VALUES (?, ?, ?)
-        ''', (sender_model, receiver_model, message_id))
+        stored_content = encode_content(message_content)
+        ts = now_ms()
         
-        conn.commit()
-        conn.close()
+        if self._in_turn:
+            # Inside a turn the inserts are buffered and written in a batch by
+            # end_turn(), which assigns the IDs
+            message_id = None
+            self._pending_messages.append(
+                (sender_model, receiver_model, message_type, stored_content, ts)
+            )
+        else:
+            # Store the message
+            cursor = self._conn.execute(INSERT_MSG_SQL, (sender_model, message_type, stored_content, ts))
+            message_id = cursor.lastrowid
+            
+            # Store the interaction
+            self._conn.execute(INSERT_INTERACTION_SQL, (sender_model, receiver_model, message_id, stored_content, ts))
+            self._conn.commit()
         
-        print(f"Message sent from {sender_model} to {receiver_model}: {message_content[:50]}...")
+        logger.debug("Message sent from %s to %s: %.50s...", sender_model, receiver_model, message_content)
         return message_id
     
     def receive_message(self, model_id, message_id=None):
@@ -96,39 +637,93 @@ class ModelControlProtocol:
         Returns:
             message: The retrieved message content or None if no message
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         if message_id:
-            # Retrieve a specific message
-            cursor.execute('''
-            SELECT m.message_content, m.model_id
-            FROM messages m
-            JOIN model_interactions mi ON m.id = mi.message_id
-            WHERE mi.message_id = ? AND mi.model2_id = ?
-            ''', (message_id, model_id))
+            # Retrieve a specific message. Stored messages never change, so
+            # found rows are served from an LRU cache; misses are not cached
+            # because the message may still be sent later.
+            key = (model_id, message_id)
+            result = self._message_cache.get(key)
+            if result is not None:
+                self._message_cache.move_to_end(key)
+            else:
+                result = self._conn.execute(SELECT_MESSAGE_SQL, (message_id, model_id)).fetchone()
+                if result:
+                    result = (decode_content(result[0]), result[1])
+                    self._message_cache[key] = result
+                    if len(self._message_cache) > MESSAGE_CACHE_SIZE:
+                        self._message_cache.popitem(last=False)
         else:
             # Retrieve the latest message for this model
-            cursor.execute('''
-            SELECT m.message_content, m.model_id
-            FROM messages m
-            JOIN model_interactions mi ON m.id = mi.message_id
-            WHERE mi.model2_id = ?
-            ORDER BY m.timestamp DESC
-            LIMIT 1
-            ''', (model_id,))
-        
-        result = cursor.fetchone()
-        conn.close()
+            result = self._conn.execute(SELECT_LATEST_SQL, (model_id,)).fetchone()
+            if result:
+                result = (decode_content(result[0]), result[1])
         
         if result:
-            print(f"{model_id} received message from {result[1]}: {result[0][:50]}...")
+            logger.debug("%s received message from %s: %.50s...", model_id, result[1], result[0])
             return result[0]
         else:
-            print(f"No messages found for {model_id}")
+            logger.debug("No messages found for %s", model_id)
             return None
     
-    def execute_turn(self, initial_message=None):
+    def get_cached_response(self, key):
+        """
+        Look up a cached model response.
+        
+        Args:
+            key: The cache key of the model call
+            
+        Returns:
+            response: The cached response or None on a cache miss
+        """
+        result = self._conn.execute(SELECT_CACHE_SQL, (key,)).fetchone()
+        
+        return result[0] if result else None
+    
+    def store_cached_response(self, key, response):
+        """
+        Store a model response in the cache.
+        
+        Args:
+            key: The cache key of the model call
+            response: The response to cache
+        """
+        # Committed straight away so no write transaction stays open while
+        # the rest of the turn's models run
+        self._conn.execute(INSERT_CACHE_SQL, (key, response, now_ms()))
+        self._conn.commit()
+    
+    @cached_call
+    async def call_model(self, model_id, received):
+        """
+        Produce a model's response to the message it received.
+        
+        Args:
+            model_id: The model generating the response
+            received: The message the model received, or None
+            
+        Returns:
+            response: The model's response
+        """
+        # In a real system this would await the model API; the sleep simulates
+        # the call time without blocking the event loop
+        await asyncio.sleep(0.5)
+        
+        if received:
+            return f"RESPONSE from {model_id}: I received '{received}' and my response is..."
+        else:
+            return f"RESPONSE from {model_id}: No prior message received, starting conversation..."
+    
+    def _get_turn_lock(self):
+        """Return the lock serializing turns, created for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._turn_lock_loop is not loop:
+            # asyncio.run() creates a new loop per turn and an asyncio.Lock
+            # cannot be shared between loops
+            self._turn_lock_loop = loop
+            self._turn_lock = asyncio.Lock()
+        return self._turn_lock
+    
+    async def execute_turn_async(self, initial_message=None):
         """
         Execute a turn in the sequence, where each model passes a message to the next.
         
@@ -138,60 +733,86 @@ class ModelControlProtocol:
         Returns:
             responses: A list of all model responses in this turn
         """
-        responses = []
-        current_message = initial_message
-        
-        # Go through each model in sequence
-        for i in range(len(self.models)):
-            sender_model = self.models[i]
-            receiver_model = self.models[(i + 1) % len(self.models)]
+        # Turns share the buffered messages and turn state, so overlapping
+        # calls on one instance run one after the other
+        async with self._get_turn_lock():
+            responses = []
+            current_message = initial_message
             
-            # If this is the first model and an initial message was provided
-            if i == 0 and initial_message:
-                response = f"INITIAL: {initial_message}"
-            else:
-                # Process the received message (in a real system, this would call the actual model API)
-                received = self.receive_message(sender_model)
-                if received:
-                    response = f"RESPONSE from {sender_model}: I received '{received}' and my response is..."
-                else:
-                    response = f"RESPONSE from {sender_model}: No prior message received, starting conversation..."
-            
-            # Send the processed message to the next model
-            self.send_message(sender_model, receiver_model, response)
-            responses.append(response)
+            self.begin_turn()
+            try:
+                # Go through each model in sequence
+                for i, (sender_model, receiver_model) in enumerate(self.model_pairs):
+                    # If this is the first model and an initial message was provided
+                    if i == 0 and initial_message:
+                        response = f"INITIAL: {initial_message}"
+                    else:
+                        # Later models receive the message just sent in this turn;
+                        # only the first model has to read its message from the database
+                        received = self.receive_message(sender_model) if i == 0 else current_message
+                        response = await self.call_model(sender_model, received)
+                    
+                    # Send the processed message to the next model
+                    self.send_message(sender_model, receiver_model, response)
+                    responses.append(response)
+                    current_message = response
+            except BaseException:
+                # A failed or cancelled turn leaves nothing behind
+                self.abort_turn()
+                raise
             
-            # In a real system, we might want to pause to simulate API call time
-            time.sleep(0.5)
-        
-        return responses
+            self.end_turn()
+            return responses
     
-    def get_all_messages(self):
-        """Retrieve all messages from the database for display."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def execute_turn(self, initial_message=None):
+        """
+        Execute a turn from synchronous code by running execute_turn_async.
         
-        cursor.execute('''
-        SELECT m.id, m.model_id, mi.model2_id, m.message_content, m.timestamp
-        FROM messages m
-        JOIN model_interactions mi ON m.id = mi.message_id
-        ORDER BY m.timestamp ASC
-        ''')
+        Use execute_turn_async directly when an event loop is already running.
         
-        messages = cursor.fetchall()
-        conn.close()
+        Args:
+            initial_message: Optional starting message for the first model
+            
+        Returns:
+            responses: A list of all model responses in this turn
+        """
+        return asyncio.run(self.execute_turn_async(initial_message))
+    
+    def get_all_messages(self, after_id=0, limit=None):
+        """
+        Retrieve messages from the database for display, oldest first.
+        
+        Args:
+            after_id: Only return messages with an ID greater than this, so
+                callers can fetch just the messages added since their last call
+            limit: Optional maximum number of messages to return
+            
+        Returns:
+            messages: A list of (id, sender, receiver, content, timestamp) rows
+        """
+        # A negative LIMIT means no limit in SQLite
+        rows = self._conn.execute(SELECT_HISTORY_SQL, (after_id, -1 if limit is None else limit)).fetchall()
+        messages = [
+            (msg_id, sender, receiver, decode_content(content), format_ts(ts))
+            for msg_id, sender, receiver, content, ts in rows
+        ]
         
         return messages
 
 
 def main():
     """Main function to run the command line interface for the MCP."""
+    configure_logging()
     mcp = ModelControlProtocol()
+    history = []
     
+    # Let queued log records reach stdout before the CLI prints its own output
+    flush_logging()
     print("\n=== Model Control Protocol (MCP) Command Line Interface ===")
     print("This tool allows models to communicate and collaborate in sequence.")
     
     while True:
+        flush_logging()
         print("\nOptions:")
         print("1. Start a new conversation")
         print("2. Continue existing conversation")
@@ -217,24 +838,37 @@ def main():
                 print(f"{mcp.models[i]}: {response}")
         
         elif choice == '3':
-            messages = mcp.get_all_messages()
-            if not messages:
+            # Only fetch the messages added since the history was last viewed
+            last_id = history[-1][0] if history else 0
+            history.extend(mcp.get_all_messages(after_id=last_id))
+            if not history:
                 print("\nNo messages found in the database.")
             else:
                 print("\n=== Message History ===")
-                for msg in messages:
+                for msg in history:
                     msg_id, sender, receiver, content, timestamp = msg
                     print(f"[{timestamp}] {sender} -> {receiver}: {content[:50]}...")
         
         elif choice == '4':
             confirm = input("Are you sure you want to clear the database? (y/n): ")
             if confirm.lower() == 'y':
+                mcp.close()
                 try:
                     os.remove(mcp.db_path)
                     print(f"Database {mcp.db_path} has been deleted.")
-                    mcp.setup_database()
                 except FileNotFoundError:
                     print("Database file doesn't exist yet.")
+                
+                # Remove the WAL side files so the fresh database starts clean
+                for suffix in ("-wal", "-shm"):
+                    try:
+                        os.remove(mcp.db_path + suffix)
+                    except FileNotFoundError:
+                        pass
+                
+                mcp.connect()
+                mcp.setup_database()
+                history = []
         
         elif choice == '5':
             print("Exiting MCP. Goodbye!")